@@ -1,6 +1,9 @@
+from collections.abc import Set
+
 import numpy as np
 try:
-    from torchvision.ops import nms
+    import torch
+    from torchvision.ops import box_iou, nms
 except ImportError as error:
     # TODO
     raise ImportError(
@@ -14,6 +17,96 @@ from ..base import Property
 from ..types.array import StateVector
 from ..types.detection import Detection
 
+
+def _cluster_nms(boxes, scores, iou_threshold):
+    """Non-maxima suppression performed with tensor operations.
+
+    Implements Cluster-NMS, which iterates matrix based suppression until the
+    set of kept boxes converges. The result is identical to greedy NMS (as per
+    :func:`torchvision.ops.nms`). Suppression is performed on the device the
+    boxes are on, but checking for convergence requires a synchronisation with
+    the host each iteration; typically only a few iterations are needed, but in
+    the worst case this is the number of boxes. Memory required is quadratic in
+    the number of boxes. Returns indices of the kept boxes, sorted in decreasing
+    order of score.
+    """
+    order = scores.argsort(descending=True)
+    sorted_boxes = boxes[order]
+    # Whether each box overlaps a higher scoring box by more than the threshold
+    overlaps = (box_iou(sorted_boxes, sorted_boxes) > iou_threshold).triu_(diagonal=1)
+    keep = torch.ones(len(order), dtype=torch.bool, device=scores.device)
+    for _ in range(len(order)):
+        # Only boxes which are currently kept can suppress lower scoring boxes
+        new_keep = ~(overlaps & keep.unsqueeze(1)).any(dim=0)
+        if torch.equal(new_keep, keep):
+            break
+        keep = new_keep
+    return order[keep]
+
+
+class LazyDetectionBatch(Set):
+    """Set of detections from a frame, with each detection constructed on demand.
+
+    Holds state vectors and metadata of all detections as arrays, only creating each
+    :class:`~.Detection` when it is first accessed, e.g. when iterated over. This avoids
+    constructing detections which are discarded without being used. Detections are only
+    created once, so repeated iteration returns the same objects, and set operations
+    (which return a :class:`set`) behave as they would on a set of detections.
+
+    Parameters
+    ----------
+    state_vectors : :class:`numpy.ndarray` of shape (N, D)
+        State vector of each detection.
+    timestamp : :class:`datetime.datetime`
+        Timestamp of all detections.
+    raw_boxes : :class:`numpy.ndarray` of shape (N, 4)
+        Normalised box of each detection, stored as ``"raw_box"`` metadata.
+    class_entries : list of dict
+        Class of each detection, stored as ``"class"`` metadata.
+    scores : :class:`numpy.ndarray` of shape (N, )
+        Score of each detection, stored as ``"score"`` metadata.
+    """
+
+    def __init__(self, state_vectors, timestamp, raw_boxes, class_entries, scores):
+        self.state_vectors = state_vectors
+        self.timestamp = timestamp
+        self.raw_boxes = raw_boxes
+        self.class_entries = class_entries
+        self.scores = scores
+        self._detections = [None] * len(state_vectors)
+        self._created = set()
+
+    @classmethod
+    def _from_iterable(cls, iterable):
+        return set(iterable)
+
+    def _detection(self, index):
+        detection = self._detections[index]
+        if detection is None:
+            detection = Detection(
+                state_vector=StateVector(self.state_vectors[index]),
+                timestamp=self.timestamp,
+                metadata={
+                    "raw_box": self.raw_boxes[index],  # normalised x0 y0 x1 y1
+                    "class": self.class_entries[index],
+                    "score": self.scores[index],
+                })
+            self._detections[index] = detection
+            self._created.add(detection)
+        return detection
+
+    def __iter__(self):
+        for index in range(len(self._detections)):
+            yield self._detection(index)
+
+    def __len__(self):
+        return len(self._detections)
+
+    def __contains__(self, item):
+        # Detection not yet created can't be equal to item
+        return item in self._created
+
+
 class GenericPytorchBoxObjectWrapper():
     """
     A wrapper to be used around any box detector object.
@@ -67,7 +160,42 @@ class PyTorchBoxObjectDetector(_VideoAsyncBoxDetector):
 
     modelwrapper: GenericPytorchBoxObjectWrapper = Property(doc="A generic wrapper around any Pytorch object detection model")
     use_nms: bool = Property(doc="Use non-maxima supression.", default=False)
-
+    use_fast_nms: bool = Property(
+        doc="Perform non-maxima supression of boxes on a CUDA device with matrix operations, "
+            "rather than with :func:`torchvision.ops.nms`. This requires memory quadratic in "
+            "the number of boxes, and a synchronisation with the host for each iteration to "
+            "convergence. Boxes on the CPU, where this is considerably slower, use "
+            ":func:`torchvision.ops.nms` regardless. Only applicable if :attr:`use_nms` is "
+            "``True``.",
+        default=False)
+    use_fp16: bool = Property(
+        doc="Run the detection function under :class:`torch.autocast` with half precision "
+            "floats, for lower latency on GPUs with Tensor Cores. This requires no changes to "
+            "the wrapped model, but may reduce accuracy.",
+        default=False)
+    device: str = Property(
+        doc="Device (e.g. ``'cuda'``) to move frames to before preprocessing. If set, the "
+            "wrapper's preprocess function is passed a 3xNxM float tensor on this device, "
+            "with values scaled to the range ``[0, 1]``, rather than the NxMx3 uint8 numpy "
+            "array. CUDA transfers are staged through pinned memory, so that conversion and "
+            "normalisation of frames is performed on the GPU. Default `None`, where frames "
+            "are passed to the preprocess function unaltered.",
+        default=None)
+    pipeline: bool = Property(
+        doc="Overlap the transfer of each frame to the device with detection on the previous "
+            "frame, using separate CUDA streams. Detections for each frame are therefore "
+            "yielded once the following frame has been read (still with the timestamp of the "
+            "frame they relate to). Requires :attr:`device` to be a CUDA device, and isn't "
+            "used if :attr:`run_async` is ``True``.",
+        default=False)
+    use_compile: bool = Property(
+        doc="Compile the detection function with :func:`torch.compile`, specialised to the "
+            "size of the frames (which is typically constant for a video stream). This is "
+            "done on the first frame, and again for each new frame size, so the first frame "
+            "(of each size) takes considerably longer to process. Once the recompile limit "
+            "(see :mod:`torch._dynamo.config`) is reached, further frame sizes fall back to "
+            "running uncompiled.",
+        default=False)
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -77,55 +205,134 @@ class PyTorchBoxObjectDetector(_VideoAsyncBoxDetector):
         self._detect_fn = self.modelwrapper.detect_fn
         self._postprocess_fn = self.modelwrapper.postprocess_fn
         self.category_index = self.modelwrapper.category_index
-       
 
-    def _get_detections_from_frame(self, frame):        
-        inp = self._preprocess_fn(frame.pixels)
-        tmp_prediction = self._detect_fn(inp)
-        prediction = self._postprocess_fn(tmp_prediction)
-        
+        self._device = torch.device(self.device) if self.device is not None else None
+        if self.pipeline and (self._device is None or self._device.type != 'cuda'):
+            raise ValueError("Pipelining requires device to be a CUDA device")
+        self._pinned_frames = {}
+        self._frame_size = None
+        self._box_scale = None
+
+        if self.use_fp16:
+            if self._device is not None:
+                device_type = self._device.type
+            else:
+                device_type = 'cuda' if torch.cuda.is_available() else 'cpu'
+            self._detect_fn = torch.autocast(device_type, dtype=torch.float16)(self._detect_fn)
+
+        if self.use_compile:
+            # Compiled lazily on first call. Static shapes avoid guards on (and code generated
+            # for) varying frame sizes, with recompilation if the frame size changes.
+            self._detect_fn = torch.compile(
+                self._detect_fn, mode='reduce-overhead', dynamic=False)
+
+    def _frame_to_tensor(self, pixels, staging_index=0):
+        if self._device.type == 'cuda':
+            # Reuse pinned staging memory, so the copy to the GPU can be asynchronous. Before
+            # overwriting, wait for any previous copy from it to complete.
+            pinned_frame, copied_event = self._pinned_frames.get(staging_index, (None, None))
+            if copied_event is not None:
+                copied_event.synchronize()
+            if pinned_frame is None or pinned_frame.shape != pixels.shape:
+                pinned_frame = torch.empty(pixels.shape, dtype=torch.uint8, pin_memory=True)
+            np.copyto(pinned_frame.numpy(), pixels)
+            tensor = pinned_frame.to(self._device, non_blocking=True)
+            copied_event = torch.cuda.Event()
+            copied_event.record(torch.cuda.current_stream(self._device))
+            self._pinned_frames[staging_index] = pinned_frame, copied_event
+        else:
+            tensor = torch.as_tensor(np.ascontiguousarray(pixels), device=self._device)
+        return tensor.permute(2, 0, 1).float().div_(255)
+
+    def _predict(self, inp):
+        return self._postprocess_fn(self._detect_fn(self._preprocess_fn(inp)))
+
+    def _detections_gen(self):
+        if not self.pipeline:
+            yield from super()._detections_gen()
+            return
+
+        copy_stream = torch.cuda.Stream(self._device)
+        compute_stream = torch.cuda.Stream(self._device)
+        previous = None
+        for index, (_, frame) in enumerate(self.sensor):
+            # Start transfer of this frame whilst detection on the previous frame runs. Staging
+            # memory alternates, as the previous frame's may still be in use.
+            with torch.cuda.stream(copy_stream):
+                tensor = self._frame_to_tensor(frame.pixels, staging_index=index % 2)
+            tensor.record_stream(compute_stream)
+
+            if previous is not None:
+                compute_stream.synchronize()
+                previous_frame, previous_prediction = previous
+                detections = self._detections_from_prediction(
+                    previous_frame, previous_prediction)
+
+            compute_stream.wait_stream(copy_stream)
+            with torch.cuda.stream(compute_stream):
+                prediction = self._predict(tensor)
+
+            if previous is not None:
+                yield previous_frame.timestamp, detections
+            previous = frame, prediction
+
+        if previous is not None:
+            compute_stream.synchronize()
+            previous_frame, previous_prediction = previous
+            yield previous_frame.timestamp, self._detections_from_prediction(
+                previous_frame, previous_prediction)
+
+    def _get_detections_from_frame(self, frame):
+        if self._device is not None:
+            prediction = self._predict(self._frame_to_tensor(frame.pixels))
+        else:
+            prediction = self._predict(frame.pixels)
+        return self._detections_from_prediction(frame, prediction)
+
+    def _detections_from_prediction(self, frame, prediction):
         # Perform non-max supression or not
-        if self.use_nms:
+        if self.use_nms and self.use_fast_nms and prediction["boxes"].is_cuda:
+            keep_idx = _cluster_nms(prediction["boxes"], prediction['scores'], 0.4)
+        elif self.use_nms:
             keep_idx = nms(prediction["boxes"], prediction['scores'], 0.4)
         else:
-            keep_idx = np.ones(prediction['scores'].size(),dtype=bool)
-            
-        # Extract results
-        nboxes = prediction["boxes"][keep_idx].cpu().detach().numpy() # .clip(0,1)
+            keep_idx = torch.arange(prediction['scores'].numel(),
+                                    device=prediction['scores'].device)
+
+        # Extract results, gathering them on the device so that only a single
+        # device to host copy (and synchronisation) is needed per frame. Gathered in
+        # the promoted type of boxes and scores, so that their precision is retained,
+        # with labels reinterpreted bitwise (rather than converted) so they are exact.
+        dtype = torch.promote_types(prediction["boxes"].dtype, prediction['scores'].dtype)
+        labels = prediction['labels'][keep_idx].to(torch.int64).unsqueeze(1).view(dtype)
+        results = torch.cat((prediction["boxes"][keep_idx].to(dtype),
+                             prediction['scores'][keep_idx].to(dtype).unsqueeze(1),
+                             labels),
+                            dim=1).detach().cpu().numpy()
+        nboxes = results[:, :4]
         boxes = nboxes.astype(int)
-        classes = prediction['labels'][keep_idx].cpu().detach().numpy()
-        scores = prediction['scores'][keep_idx].cpu().detach().numpy()
-        
-        
+        scores = results[:, 4]
+        classes = np.ascontiguousarray(results[:, 5:]).view(np.int64)[:, 0]
+
         # Form detections
-        detections = set()
         frame_height, frame_width, _ = frame.pixels.shape
-                
-        # convert to relative boxes
-        nboxes[:,0] /= frame_width
-        nboxes[:,1] /= frame_height
-        nboxes[:,2] /= frame_width
-        nboxes[:,3] /= frame_height
-        nboxes = nboxes.clip(0,1)
-    
-        
-        for box, nbox, class_, score in zip(boxes, nboxes, classes, scores):
-            metadata = {
-                "raw_box": nbox, # normalised x0 y0 x1 y1
-                "class": self.category_index[class_],
-                "score": score,
-            }
-            # Transform box to be in format (x, y, w, h)
-            state_vector = StateVector([box[0],
-                                        box[1],
-                                        (box[2] - box[0]),
-                                        (box[3] - box[1])])
-            detection = Detection(state_vector=state_vector,
-                                  timestamp=frame.timestamp,
-                                  metadata=metadata)
-            detections.add(detection)
-        
-        return detections
+        if self._frame_size != (frame_width, frame_height) \
+                or self._box_scale.dtype != nboxes.dtype:
+            self._frame_size = (frame_width, frame_height)
+            self._box_scale = np.array(
+                [frame_width, frame_height, frame_width, frame_height], dtype=nboxes.dtype)
+
+        # convert to relative boxes, clipping in place to avoid another copy
+        nboxes /= self._box_scale
+        np.clip(nboxes, 0, 1, out=nboxes)
+
+        # Transform boxes to be in format (x, y, w, h)
+        state_vectors = np.hstack((boxes[:, :2], boxes[:, 2:4] - boxes[:, :2]))
+        class_entries = [self.category_index[class_] for class_ in classes]
+
+        # Detection objects are only constructed as they are consumed
+        return LazyDetectionBatch(
+            state_vectors, frame.timestamp, nboxes, class_entries, scores)
 
 
 
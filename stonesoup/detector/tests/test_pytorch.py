@@ -0,0 +1,231 @@
+import datetime
+
+import numpy as np
+import pytest
+
+from stonesoup.types.sensordata import ImageFrame
+
+try:
+    import torch
+    from torchvision.ops import nms
+    from stonesoup.detector.pytorch import (
+        GenericPytorchBoxObjectWrapper, LazyDetectionBatch, PyTorchBoxObjectDetector,
+        _cluster_nms)
+except ImportError:
+    # Catch optional dependencies import error
+    pytest.skip(
+        "Skipping due to missing optional dependencies. Usage of the PyTorch detectors "
+        "requires that PyTorch and Torchvision are installed. A quick guide on how to set "
+        "these up can be found here: https://pytorch.org/get-started/locally/",
+        allow_module_level=True
+    )
+
+
+def test_pytorch_box_object_detector():
+
+    # Expect Type error
+    with pytest.raises(TypeError):
+        PyTorchBoxObjectDetector()
+
+
+@pytest.mark.parametrize('num_boxes', [0, 1, 10, 200])
+@pytest.mark.parametrize('iou_threshold', [0.1, 0.4, 0.7])
+def test_cluster_nms(num_boxes, iou_threshold):
+    generator = torch.Generator().manual_seed(num_boxes)
+    corners = torch.rand(num_boxes, 2, generator=generator) * 100
+    sizes = torch.rand(num_boxes, 2, generator=generator) * 30 + 1
+    boxes = torch.cat((corners, corners + sizes), dim=1)
+    scores = torch.rand(num_boxes, generator=generator)
+
+    assert torch.equal(_cluster_nms(boxes, scores, iou_threshold),
+                       nms(boxes, scores, iou_threshold))
+
+
+@pytest.mark.parametrize('use_fp16', [False, True])
+def test_pytorch_box_object_detector_fp16(use_fp16):
+    wrapper = GenericPytorchBoxObjectWrapper()
+    weights = torch.eye(3)
+    wrapper.detect_fn = lambda inp: inp @ weights
+
+    detector = PyTorchBoxObjectDetector(None, modelwrapper=wrapper, use_fp16=use_fp16)
+
+    output = detector._detect_fn(torch.ones(2, 3))
+    assert output.dtype == (torch.float16 if use_fp16 else torch.float32)
+
+
+def test_pytorch_box_object_detector_device():
+    wrapper = GenericPytorchBoxObjectWrapper()
+    wrapper.category_index = {1: {'id': 1, 'name': 'object'}}
+    inputs = []
+
+    def detect_fn(inp):
+        inputs.append(inp)
+        return {'boxes': torch.tensor([[10., 20., 30., 60.]]),
+                'labels': torch.tensor([1]),
+                'scores': torch.tensor([0.9])}
+    wrapper.detect_fn = detect_fn
+
+    detector = PyTorchBoxObjectDetector(None, modelwrapper=wrapper, device='cpu')
+    pixels = np.full((80, 40, 3), 255, dtype=np.uint8)
+    detections = detector._get_detections_from_frame(
+        ImageFrame(pixels, datetime.datetime.now()))
+
+    inp, = inputs
+    assert inp.shape == (3, 80, 40)
+    assert inp.dtype == torch.float32
+    assert torch.all(inp == 1)
+
+    detection, = detections
+    assert np.array_equal(detection.state_vector, [[10], [20], [20], [40]])
+    assert np.allclose(detection.metadata['raw_box'], [0.25, 0.25, 0.75, 0.75])
+    assert detection.metadata['class'] == {'id': 1, 'name': 'object'}
+
+
+def test_pytorch_box_object_detector_pipeline_requires_cuda():
+    with pytest.raises(ValueError, match="CUDA"):
+        PyTorchBoxObjectDetector(
+            None, modelwrapper=GenericPytorchBoxObjectWrapper(), device='cpu', pipeline=True)
+
+
+@pytest.mark.skipif(not torch.cuda.is_available(), reason="CUDA not available")
+def test_pytorch_box_object_detector_pipeline():
+    wrapper = GenericPytorchBoxObjectWrapper()
+    wrapper.category_index = {1: {'id': 1, 'name': 'object'}}
+
+    def detect_fn(inp):
+        # Box position depends on frame content, to check frames aren't mixed up
+        offset = inp[0, 0, 0] * 10
+        return {'boxes': torch.stack([offset, offset, offset + 10, offset + 20]).unsqueeze(0),
+                'labels': torch.tensor([1], device=inp.device),
+                'scores': torch.tensor([0.9], device=inp.device)}
+    wrapper.detect_fn = detect_fn
+
+    start = datetime.datetime.now()
+    frames = [
+        (start + datetime.timedelta(seconds=i),
+         ImageFrame(np.full((80, 40, 3), i, dtype=np.uint8),
+                    start + datetime.timedelta(seconds=i)))
+        for i in range(5)]
+
+    detector = PyTorchBoxObjectDetector(frames, modelwrapper=wrapper, device='cuda')
+    pipelined_detector = PyTorchBoxObjectDetector(
+        frames, modelwrapper=wrapper, device='cuda', pipeline=True)
+
+    expected = list(detector._detections_gen())
+    results = list(pipelined_detector._detections_gen())
+    assert len(results) == len(expected) == len(frames)
+    for (timestamp, detections), (expected_timestamp, expected_detections) \
+            in zip(results, expected):
+        assert timestamp == expected_timestamp
+        detection, = detections
+        expected_detection, = expected_detections
+        assert np.array_equal(detection.state_vector, expected_detection.state_vector)
+
+
+def test_lazy_detection_batch():
+    timestamp = datetime.datetime.now()
+    state_vectors = np.array([[10, 20, 20, 40], [0, 5, 10, 10], [30, 30, 5, 5]])
+    raw_boxes = np.array([[0.1, 0.2, 0.3, 0.6], [0., 0.05, 0.1, 0.15], [0.3, 0.3, 0.35, 0.35]])
+    class_entries = [{'id': 1, 'name': 'object'}] * 3
+    scores = np.array([0.9, 0.8, 0.7])
+    detections = LazyDetectionBatch(state_vectors, timestamp, raw_boxes, class_entries, scores)
+
+    assert len(detections) == 3
+    assert not detections._created  # Nothing constructed yet
+
+    detection_list = list(detections)
+    assert detection_list == list(detections)  # Same objects on repeated iteration
+    for detection, state_vector, raw_box, score in zip(
+            detection_list, state_vectors, raw_boxes, scores):
+        assert detection in detections
+        assert detection.timestamp == timestamp
+        assert np.array_equal(detection.state_vector, state_vector[:, np.newaxis])
+        assert np.array_equal(detection.metadata['raw_box'], raw_box)
+        assert detection.metadata['class'] == {'id': 1, 'name': 'object'}
+        assert detection.metadata['score'] == score
+
+    # Behaves as a set of detections
+    associated = {detection_list[0]}
+    assert detections - associated == set(detection_list[1:])
+    assert detections | associated == set(detection_list)
+    assert associated | detections == set(detection_list)
+    assert detections == set(detection_list)
+
+
+def test_pytorch_box_object_detector_compile(monkeypatch):
+    # Compile with a backend which records graphs and runs them uncompiled, as inductor
+    # is slow to compile
+    compiled_shapes = []
+
+    def backend(graph_module, example_inputs):
+        compiled_shapes.append(tuple(example_inputs[0].shape))
+        return graph_module.forward
+    torch_compile = torch.compile
+    monkeypatch.setattr(
+        torch, 'compile',
+        lambda fn, mode, dynamic: torch_compile(fn, backend=backend, dynamic=dynamic))
+
+    wrapper = GenericPytorchBoxObjectWrapper()
+    wrapper.category_index = {1: {'id': 1, 'name': 'object'}}
+
+    def detect_fn(inp):
+        # Box across whole of frame
+        _, height, width = inp.shape
+        return {'boxes': torch.tensor([[0., 0., width, height]]) * inp.max(),
+                'labels': torch.tensor([1]),
+                'scores': torch.tensor([0.9])}
+    wrapper.detect_fn = detect_fn
+    detector = PyTorchBoxObjectDetector(
+        None, modelwrapper=wrapper, device='cpu', use_compile=True)
+
+    shapes = [(80, 40, 3), (80, 40, 3), (60, 40, 3), (60, 40, 3), (80, 40, 3)]
+    for shape in shapes:
+        detection, = detector._get_detections_from_frame(
+            ImageFrame(np.full(shape, 255, dtype=np.uint8), datetime.datetime.now()))
+        assert np.array_equal(detection.state_vector, [[0], [0], [shape[1]], [shape[0]]])
+
+    # Only compiled on first frame, and for each new frame size, with static shapes
+    assert compiled_shapes == [(3, 80, 40), (3, 60, 40)]
+
+
+@pytest.mark.parametrize('dtype', [torch.float32, torch.float64])
+def test_pytorch_box_object_detector_precision(dtype):
+    wrapper = GenericPytorchBoxObjectWrapper()
+    wrapper.category_index = {16777217: {'id': 16777217, 'name': 'object'}}
+    boxes = torch.tensor([[10.123456789, 20.987654321, 30.5, 60.25]], dtype=dtype)
+    scores = torch.tensor([0.123456789], dtype=dtype)
+    wrapper.detect_fn = lambda inp: {
+        'boxes': boxes, 'labels': torch.tensor([16777217]), 'scores': scores}
+
+    detector = PyTorchBoxObjectDetector(None, modelwrapper=wrapper)
+    detection, = detector._get_detections_from_frame(
+        ImageFrame(np.zeros((80, 40, 3), dtype=np.uint8), datetime.datetime.now()))
+
+    numpy_boxes = boxes.numpy()
+    assert detection.metadata['raw_box'].dtype == numpy_boxes.dtype
+    assert np.array_equal(detection.metadata['raw_box'],
+                          numpy_boxes[0] / np.array([40, 80, 40, 80], dtype=numpy_boxes.dtype))
+    assert detection.metadata['score'] == scores.numpy()[0]
+    assert detection.metadata['score'].dtype == numpy_boxes.dtype
+    if dtype == torch.float64:
+        # Labels beyond float32 precision retained
+        assert detection.metadata['class']['id'] == 16777217
+
+
+def test_pytorch_box_object_detector_fast_nms_cpu(monkeypatch):
+    def cluster_nms(*args):
+        raise AssertionError("Cluster NMS shouldn't be used on CPU")
+    monkeypatch.setattr('stonesoup.detector.pytorch._cluster_nms', cluster_nms)
+
+    wrapper = GenericPytorchBoxObjectWrapper()
+    wrapper.category_index = {1: {'id': 1, 'name': 'object'}}
+    wrapper.detect_fn = lambda inp: {
+        'boxes': torch.tensor([[10., 20., 30., 60.], [11., 20., 30., 60.]]),
+        'labels': torch.tensor([1, 1]),
+        'scores': torch.tensor([0.9, 0.8])}
+
+    detector = PyTorchBoxObjectDetector(
+        None, modelwrapper=wrapper, use_nms=True, use_fast_nms=True)
+    detection, = detector._get_detections_from_frame(
+        ImageFrame(np.zeros((80, 40, 3), dtype=np.uint8), datetime.datetime.now()))
+    assert detection.metadata['score'] == pytest.approx(0.9)
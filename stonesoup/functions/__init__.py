@@ -44,7 +44,8 @@ def cholesky_eps(A, lower=False):
     Parameters
     ----------
     A : numpy.ndarray
-        Symmetric positive-definite matrix.
+        Symmetric positive-definite matrix, or stack of matrices of shape
+        (..., D, D), which are decomposed simultaneously.
     lower : bool
         Whether to return lower or upper triangular decomposition. Default
         `False` which returns upper.
@@ -54,19 +55,20 @@ def cholesky_eps(A, lower=False):
     L : numpy.ndarray
         Upper/lower triangular Cholesky decomposition.
     """
-    eps = np.spacing(np.max(np.diag(A)))
+    eps = np.spacing(np.max(np.diagonal(A, axis1=-2, axis2=-1), axis=-1))
 
     L = np.zeros(A.shape)
-    for i in range(A.shape[0]):
+    for i in range(A.shape[-1]):
         for j in range(i):
-            L[i, j] = (A[i, j] - L[i, :]@L[j, :].T) / L[j, j]
-        val = A[i, i] - L[i, :]@L[i, :].T
-        L[i, i] = np.sqrt(val) if val > eps else np.sqrt(eps)
+            L[..., i, j] = (A[..., i, j] - np.sum(L[..., i, :]*L[..., j, :], axis=-1)) \
+                / L[..., j, j]
+        val = A[..., i, i] - np.sum(L[..., i, :]**2, axis=-1)
+        L[..., i, i] = np.sqrt(np.where(val > eps, val, eps))
 
     if lower:
         return L
     else:
-        return L.T
+        return np.swapaxes(L, -1, -2)
 
 
 def jacobian(fun, x,  **kwargs):
@@ -649,6 +651,12 @@ def sde_euler_maruyama_integration(fun, t_values, state_x0):
     Performs Stochastic Differential Equation Integration using the Euler
     Maruyama method.
 
+    The state vector can be a :class:`~.StateVectors`, in which case all state
+    vectors are integrated simultaneously. :obj:`fun` should then return
+    the drift with the same shape as the state vectors, and either a single
+    diffusion matrix, or an array of diffusion matrices of shape `(N, D, D)`
+    (one for each of the `N` state vectors).
+
     Parameters
     ----------
     fun : callable
@@ -660,13 +668,18 @@ def sde_euler_maruyama_integration(fun, t_values, state_x0):
 
     Returns
     -------
-    : :class:`~.StateVector`
+    : :class:`~.StateVector` or :class:`~.StateVectors`
         Final value for the time in last value in :obj:`t_values`
     """
-    state_x = copy.deepcopy(state_x0)
+    # Shallow copy suffices, as the state vector is replaced rather than modified in place
+    state_x = copy.copy(state_x0)
     for t, next_t in zip(t_values[:-1], t_values[1:]):
         delta_t = next_t - t
-        delta_w = np.random.normal(scale=np.sqrt(delta_t), size=(state_x.ndim, 1))
+        delta_w = np.random.normal(scale=np.sqrt(delta_t), size=state_x.state_vector.shape)
         a, b = fun(state_x, t)
-        state_x.state_vector = state_x.state_vector + a*delta_t + b@delta_w
+        if b.ndim == 3:
+            diffusion = np.einsum('nij,jn->in', b, delta_w)
+        else:
+            diffusion = b @ delta_w
+        state_x.state_vector = state_x.state_vector + a*delta_t + diffusion
     return state_x.state_vector
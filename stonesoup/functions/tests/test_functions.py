@@ -6,7 +6,8 @@ from pytest import approx, raises
 
 from .. import (
     cholesky_eps, jacobian, gm_reduce_single, mod_bearing, mod_elevation, gauss2sigma,
-    rotx, roty, rotz, cart2sphere, cart2angles, pol2cart, sphere2cart, dotproduct)
+    rotx, roty, rotz, cart2sphere, cart2angles, pol2cart, sphere2cart, dotproduct,
+    sde_euler_maruyama_integration)
 from ...types.array import StateVector, StateVectors, Matrix
 from ...types.state import State, GaussianState
 
@@ -34,6 +35,17 @@ def test_cholesky_eps_bad():
     cholesky_eps(matrix)
 
 
+def test_cholesky_eps_stacked():
+    matrices = np.random.uniform(-1, 1, (10, 4, 2))
+    matrices = matrices @ np.swapaxes(matrices, -1, -2)  # Positive semi-definite
+
+    for lower in (False, True):
+        stacked_cholesky = cholesky_eps(matrices, lower)
+        assert stacked_cholesky.shape == matrices.shape
+        for matrix, cholesky_matrix in zip(matrices, stacked_cholesky):
+            assert np.allclose(cholesky_eps(matrix, lower), cholesky_matrix)
+
+
 def test_jacobian():
     """ jacobian function test """
 
@@ -271,3 +283,22 @@ def test_dotproduct(state_vector1, state_vector2):
 
             assert np.allclose(dotproduct(state_vector1, state_vector2),
                                np.reshape(out, np.shape(dotproduct(state_vector1, state_vector2))))
+
+
+@pytest.mark.parametrize('batched_diffusion', [False, True])
+def test_sde_euler_maruyama_integration(batched_diffusion):
+    state_vectors = StateVectors([[1., 2., 3.], [4., 5., 6.]])
+    state = State(state_vectors)
+
+    def fun(state, t):
+        drift = np.ones(state.state_vector.shape)
+        diffusion = np.zeros((state.ndim, state.ndim))
+        if batched_diffusion:
+            diffusion = np.tile(diffusion, (state.state_vector.shape[1], 1, 1))
+        return drift, diffusion
+
+    result = sde_euler_maruyama_integration(fun, np.linspace(0, 1, 5), state)
+
+    assert isinstance(result, StateVectors)
+    assert np.allclose(result, state_vectors + 1)
+    assert state.state_vector is state_vectors  # Initial state unchanged
@@ -1,7 +1,14 @@
+import io
+import threading
+import time
+from queue import Queue
+
+import numpy as np
 import pytest
 
 try:
-    from stonesoup.reader.video import VideoClipReader, FFmpegVideoStreamReader
+    from stonesoup.reader.video import (
+        VideoClipReader, FFmpegVideoStreamReader, FreshestFrame, _FrameBuffer, _frame_buffer)
 except RuntimeError:
     # Catch FFMPEG error
     pytest.skip("Failed to import video reader classes. This is possibly "
@@ -30,4 +37,130 @@ def test_ffmpeg_video_stream_reader():
     with pytest.raises(TypeError):
         FFmpegVideoStreamReader()
 
-    # TODO: Add more tests
+
+class _FakeFFmpegStream:
+    def __init__(self, data):
+        self.stdout = io.BytesIO(data)
+
+    def poll(self):
+        # Running until all output read
+        return None if self.stdout.tell() < len(self.stdout.getbuffer()) else 0
+
+
+@pytest.mark.parametrize('reuse_frame_buffers', [False, True])
+def test_ffmpeg_video_stream_reader_run(reuse_frame_buffers):
+    width, height, num_frames = 4, 2, 7
+    frames_data = np.arange(num_frames*height*width*3, dtype=np.uint8).reshape(
+        num_frames, height, width, 3)
+
+    # Constructed without __init__, which would start FFmpeg
+    reader = FFmpegVideoStreamReader.__new__(FFmpegVideoStreamReader)
+    reader.buffer_size = 1
+    reader.reuse_frame_buffers = reuse_frame_buffers
+    reader.buffer = _FrameBuffer()  # Unbounded, so all frames can be collected
+    reader._stream_info = {'width': width, 'height': height}
+    # Trailing partial frame, which should be dropped
+    reader.stream = _FakeFFmpegStream(frames_data.tobytes() + b'\x00' * 5)
+
+    reader._run()
+    frames = [reader.buffer.get() for _ in range(len(reader.buffer))]
+    assert len(frames) == num_frames
+
+    if reuse_frame_buffers:
+        # Pool of buffer_size + 2 arrays, used in rotation
+        pool_size = reader.buffer_size + 2
+        for i, frame in enumerate(frames):
+            for j, other_frame in enumerate(frames[:i]):
+                assert (frame.pixels is other_frame.pixels) == ((i - j) % pool_size == 0)
+        # Frames not overwritten until a further buffer_size + 1 frames read (including
+        # the partial frame)
+        num_intact = reader.buffer_size + 1
+        for frame, frame_data in zip(frames[-num_intact:], frames_data[-num_intact:]):
+            assert np.array_equal(frame.pixels, frame_data)
+    else:
+        assert len({id(frame.pixels) for frame in frames}) == num_frames
+        for frame, frame_data in zip(frames, frames_data):
+            assert np.array_equal(frame.pixels, frame_data)
+
+
+class _FakeCapture:
+    def __init__(self):
+        self.num_grabbed = 0
+        self.num_retrieved = 0
+
+    def isOpened(self):
+        return True
+
+    def set(self, prop_id, value):
+        return False
+
+    def grab(self):
+        time.sleep(0.001)
+        self.num_grabbed += 1
+        return True
+
+    def retrieve(self):
+        self.num_retrieved += 1
+        return True, self.num_grabbed
+
+    def release(self):
+        pass
+
+
+def test_freshest_frame():
+    pytest.importorskip('cv2')
+    capture = _FakeCapture()
+    freshest_frame = FreshestFrame(capture)
+    try:
+        # Frames only retrieved when waited for
+        time.sleep(0.05)
+        assert capture.num_retrieved == 0
+
+        seqnumber, frame = freshest_frame.read(timeout=1)
+        assert seqnumber == 1
+        assert frame is not None
+        assert capture.num_retrieved == 1
+        assert capture.num_grabbed > 1
+
+        seqnumber, frame = freshest_frame.read(timeout=1)
+        assert seqnumber == 2
+        assert frame > 1
+
+        # Once polled, all frames are retrieved
+        freshest_frame.read(wait=False)
+        time.sleep(0.05)
+        seqnumber, _ = freshest_frame.read(wait=False)
+        assert seqnumber > 2
+    finally:
+        freshest_frame.release(timeout=1)
+
+
+def test_frame_buffer():
+    buffer = _FrameBuffer()
+    assert buffer.empty()
+
+    num_frames = 200
+
+    def produce():
+        for frame in range(num_frames):
+            buffer.put(frame)
+            if frame % 10 == 0:
+                time.sleep(0.001)  # Allow consumer to catch up and wait
+
+    producer = threading.Thread(target=produce)
+    producer.start()
+    frames = [buffer.get() for _ in range(num_frames)]
+    producer.join(timeout=1)
+
+    assert frames == list(range(num_frames))
+    assert buffer.empty()
+
+
+@pytest.mark.parametrize('buffer_size', [-1, 0, 1, 3])
+def test_frame_buffer_type(buffer_size):
+    buffer = _frame_buffer(buffer_size)
+    if buffer_size > 0:
+        assert isinstance(buffer, Queue)
+        assert buffer.maxsize == buffer_size
+    else:
+        assert isinstance(buffer, _FrameBuffer)
@@ -6,6 +6,7 @@ of video data/streams.
 
 import datetime
 import threading
+from collections import deque
 from queue import Queue
 from typing import Mapping, Tuple, Sequence, Any, List
 from urllib.parse import ParseResult
@@ -45,6 +46,57 @@ from ..buffered_generator import BufferedGenerator
 from ..types.sensordata import ImageFrame
 
 
+class _FrameBuffer:
+    """Unbounded, single consumer frame buffer
+
+    A replacement for an unbounded :class:`queue.Queue` with the same :meth:`put` and
+    blocking :meth:`get` behaviour. Appends and pops on a :class:`collections.deque` are
+    atomic, so the lock is only taken when the buffer is empty, and to wake a consumer
+    which is waiting.
+
+    This relies on the GIL, as the buffer length and count of waiting consumers are read
+    without the lock, so isn't safe on free-threaded builds of Python.
+    """
+
+    def __init__(self):
+        self._frames = deque()
+        self._lock = threading.Lock()
+        self._not_empty = threading.Condition(self._lock)
+        # Only modified with lock held, so if read as zero after an append, any waiter
+        # will see that append when it checks the buffer under the lock.
+        self._num_getters_waiting = 0
+
+    def put(self, frame):
+        self._frames.append(frame)
+        if self._num_getters_waiting:
+            with self._lock:
+                self._not_empty.notify()
+
+    def get(self):
+        if not self._frames:
+            with self._lock:
+                self._num_getters_waiting += 1
+                while not self._frames:
+                    self._not_empty.wait()
+                self._num_getters_waiting -= 1
+        return self._frames.popleft()
+
+    def empty(self):
+        return not self._frames
+
+    def __len__(self):
+        return len(self._frames)
+
+
+def _frame_buffer(buffer_size):
+    # Bounded buffers are dominated by thread hand-off, where a Queue performs as well,
+    # so the deque based buffer is only used when unbounded
+    if buffer_size > 0:
+        return Queue(maxsize=buffer_size)
+    else:
+        return _FrameBuffer()
+
+
 class VideoClipReader(FileReader, FrameReader):
     """VideoClipReader
 
@@ -154,6 +206,19 @@ class FFmpegVideoStreamReader(UrlReader, FrameReader):
         doc="Tuple of frame width and height. Default `None` where it will be detected using "
             "`ffprobe` against the input, but this may yield wrong width/height (e.g. when "
             "filters are applied), and such this option can be used to override.")
+    hwaccel: str = Property(
+        default=None,
+        doc="FFmpeg hardware acceleration method used to decode the stream (e.g. ``'cuda'``, "
+            "``'vaapi'`` or ``'auto'``), offloading decoding from the CPU. Unlike "
+            ":attr:`input_opts`, this isn't passed to `ffprobe`. Default `None` where the "
+            "stream is decoded on the CPU.")
+    reuse_frame_buffers: bool = Property(
+        default=False,
+        doc="Read frames into a pool of pre-allocated arrays, rather than allocating a new "
+            "array per frame. Frame pixel arrays are then overwritten once a further "
+            "``buffer_size + 1`` frames have been read, so this is only safe if frames aren't "
+            "kept by the consumer (e.g. not with an asynchronous detector) and otherwise "
+            "should be copied. Ignored if :attr:`buffer_size` is infinite. Default `False`.")
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
@@ -164,7 +229,7 @@ class FFmpegVideoStreamReader(UrlReader, FrameReader):
         if self.filters is None:
             self.filters = []
 
-        self.buffer = Queue(maxsize=self.buffer_size)
+        self.buffer = _frame_buffer(self.buffer_size)
 
         if self.frame_size is not None:
             self._stream_info = {
@@ -178,7 +243,10 @@ class FFmpegVideoStreamReader(UrlReader, FrameReader):
                 if s['codec_type'] == 'video')
 
         # Initialise stream
-        self.stream = ffmpeg.input(self.url.geturl(), **self.input_opts)
+        input_opts = dict(self.input_opts)
+        if self.hwaccel is not None:
+            input_opts['hwaccel'] = self.hwaccel
+        self.stream = ffmpeg.input(self.url.geturl(), **input_opts)
         for filter_ in self.filters:
             filter_name, filter_args, filter_kwargs = filter_
             self.stream = self.stream.filter(
@@ -205,22 +273,30 @@ class FFmpegVideoStreamReader(UrlReader, FrameReader):
             yield timestamp, frame
 
     def _run(self):
+        width = int(self._stream_info['width'])
+        height = int(self._stream_info['height'])
+
+        # If reusing, frames are read into a pool of pre-allocated arrays, which is
+        # large enough that a frame isn't overwritten whilst in the buffer or being
+        # processed by a consumer which doesn't keep frames. Otherwise (or with an
+        # infinite buffer) a new array is allocated for every frame.
+        if self.reuse_frame_buffers and self.buffer_size > 0:
+            frame_pool = [np.empty((height, width, 3), np.uint8)
+                          for _ in range(self.buffer_size + 2)]
+        else:
+            frame_pool = None
+
+        frame_count = 0
         while self.stream.poll() is None:
-            width = int(self._stream_info['width'])
-            height = int(self._stream_info['height'])
+            if frame_pool is not None:
+                frame_np = frame_pool[frame_count % len(frame_pool)]
+            else:
+                frame_np = np.empty((height, width, 3), np.uint8)
 
-            # Read bytes from stream
-            t0 = time.time()
-            in_bytes = self.stream.stdout.read(width * height * 3)
-            print('Frame read:',np.round(time.time()-t0,2))
-
-            if in_bytes:
-                # Transform bytes to pixels
-                frame_np = (
-                    np.frombuffer(in_bytes, np.uint8)
-                    .reshape([height, width, 3])
-                )
+            # Read bytes from stream directly into frame array
+            if self.stream.stdout.readinto(frame_np) == frame_np.nbytes:
                 frame = ImageFrame(frame_np, datetime.datetime.now())
+                frame_count += 1
 
                 # Write new frame to buffer
                 self.buffer.put(frame)
@@ -252,6 +328,15 @@ class FreshestFrame(threading.Thread):
         # if the currently available one is exactly the one you ask for
         self.latestnum = 0
 
+        # number of read() calls blocked waiting for a new frame, used to only
+        # retrieve (decode) frames which will be consumed. Once polled, every
+        # frame needs retrieving, as it may be read at any time.
+        self._num_waiting = 0
+        self._polled = False
+
+        # avoid the driver holding on to stale frames, where supported
+        self.capture.set(cv2.CAP_PROP_BUFFERSIZE, 1)
+
         # this is just for demo purposes        
         self.callback = None
         
@@ -274,14 +359,21 @@ class FreshestFrame(threading.Thread):
         counter = 0
         t0 = time.time()
         while self.running:
-            t1 = time.time()
-            dt = t1 - t0
-            ddt = 1/self.force_frame_rate-dt
-            if ddt > 0:
-                time.sleep(ddt)
-
-            # block for fresh frame
-            (rv, img) = self.capture.read()
+            if self.force_frame_rate > 0:
+                t1 = time.time()
+                dt = t1 - t0
+                ddt = 1/self.force_frame_rate-dt
+                if ddt > 0:
+                    time.sleep(ddt)
+
+            # block for fresh frame, but only decode it if it will be consumed
+            rv = self.capture.grab()
+            with self.cond:
+                consumed = self._num_waiting > 0 or self._polled or self.callback is not None
+            if rv and not consumed:
+                t0 = time.time()
+                continue
+            (rv, img) = self.capture.retrieve() if rv else (rv, None)
             counter += 1
 
             # publish the frame
@@ -303,13 +395,20 @@ class FreshestFrame(threading.Thread):
         #   may even be (0,None) if nothing received yet
 
         with self.cond:
+            if not wait:
+                self._polled = True
             if wait:
                 if seqnumber is None:
                     seqnumber = self.latestnum+1
                 if seqnumber < 1:
                     seqnumber = 1
                 
-                rv = self.cond.wait_for(lambda: self.latestnum >= seqnumber, timeout=timeout)
+                self._num_waiting += 1
+                try:
+                    rv = self.cond.wait_for(
+                        lambda: self.latestnum >= seqnumber, timeout=timeout)
+                finally:
+                    self._num_waiting -= 1
                 if not rv:
                     return (self.latestnum, self.frame)
 
@@ -366,7 +465,7 @@ class OpenCVVideoStreamReader(FrameReader):
         if self.filters is None:
             self.filters = []
 
-        self.buffer = Queue(maxsize=self.buffer_size)
+        self.buffer = _frame_buffer(self.buffer_size)
 
         # Initialise stream
         if self.run_async:
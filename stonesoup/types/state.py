@@ -677,6 +677,15 @@ class ParticleState(State):
         """The number of dimensions represented by the state."""
         return self.state_vector.shape[0]
 
+    @clearable_cached_property('weight')
+    def log_weight(self):
+        """Natural log of particle weights."""
+        if self.weight.dtype == object:
+            # Read log values directly, rather than calling log on each Probability
+            return np.fromiter(
+                map(Probability._log, self.weight), dtype=np.float64, count=len(self.weight))
+        return np.log(np.asfarray(self.weight))
+
     @clearable_cached_property('state_vector', 'weight')
     def mean(self):
         """Sample mean for particles"""
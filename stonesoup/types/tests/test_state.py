@@ -261,6 +261,13 @@ def test_particlestate_weighted():
     assert np.allclose(state.mean, StateVector([[25]]))
     assert np.allclose(state.covar, CovarianceMatrix([[1875]]))
 
+    assert state.log_weight.dtype == np.float64
+    assert np.allclose(state.log_weight, np.log(np.asfarray(weights)))
+
+    # Float weights
+    state = ParticleState(particles, weight=np.asfarray(weights))
+    assert np.allclose(state.log_weight, np.log(np.asfarray(weights)))
+
 
 def test_particlestate_angle():
     num_particles = 10
@@ -298,8 +305,10 @@ def test_particlestate_cache():
     assert np.allclose(state.covar, CovarianceMatrix([[2500]]))
 
     state.state_vector = particles + 50  # Cache cleared
+    assert np.allclose(state.log_weight, np.log(0.1))
     state.weight = state.weight * 0.5
     assert np.allclose(state.mean, StateVector([[100]]))
+    assert np.allclose(state.log_weight, np.log(0.05))
     assert np.allclose(state.covar, CovarianceMatrix([[2500]]))
 
     state = ParticleState(particles, weight=weights, fixed_covar=np.array([[1]]))
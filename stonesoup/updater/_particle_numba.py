@@ -0,0 +1,21 @@
+import math
+
+from numba import njit, prange
+
+
+# Only reassociation and contraction are enabled (rather than all fast math flags), as
+# particles with zero weight have log weight of -inf which must be handled correctly.
+@njit(parallel=True, fastmath={'reassoc', 'contract'}, cache=True)
+def normalise_log_weights(log_weights):
+    """Normalise log weights in place, such that their exponentials sum to one.
+
+    Equivalent to ``log_weights -= scipy.special.logsumexp(log_weights)``, but in a
+    single parallel pass over the weights, without any temporary arrays.
+    """
+    max_log_weight = log_weights.max()
+    total = 0.
+    for i in prange(log_weights.size):
+        total += math.exp(log_weights[i] - max_log_weight)
+    log_sum = max_log_weight + math.log(total)
+    for i in prange(log_weights.size):
+        log_weights[i] -= log_sum
@@ -1,18 +1,26 @@
 import copy
+from collections import defaultdict
 from functools import lru_cache
 
 import numpy as np
-from scipy.linalg import inv
+from scipy.linalg import cho_factor, cho_solve
 from scipy.special import logsumexp
 
+try:
+    from ._particle_numba import normalise_log_weights
+except ImportError:
+    normalise_log_weights = None
+
 from .base import Updater
 from .kalman import KalmanUpdater, ExtendedKalmanUpdater
 from ..base import Property
 from ..functions import cholesky_eps, sde_euler_maruyama_integration
 from ..resampler import Resampler
+from ..types.array import StateVectors
 from ..types.numeric import Probability
 from ..types.prediction import (
     Prediction, ParticleMeasurementPrediction, GaussianStatePrediction, MeasurementPrediction)
+from ..types.state import State
 from ..types.update import ParticleStateUpdate, Update
 
 
@@ -43,18 +51,73 @@ class ParticleUpdater(Updater):
         : :class:`~.ParticleState`
             The state posterior
         """
-        predicted_state = copy.copy(hypothesis.prediction)
-
         if hypothesis.measurement.measurement_model is None:
             measurement_model = self.measurement_model
         else:
             measurement_model = hypothesis.measurement.measurement_model
 
-        new_weight = np.asfarray(np.log(predicted_state.weight)) + measurement_model.logpdf(
-            hypothesis.measurement, predicted_state, **kwargs)
+        log_likelihood = measurement_model.logpdf(
+            hypothesis.measurement, hypothesis.prediction, **kwargs)
+
+        return self._update_weights(hypothesis, log_likelihood)
+
+    def update_many(self, hypotheses, **kwargs):
+        """Particle Filter update step for multiple hypotheses
+
+        Equivalent to calling :meth:`update` for each hypothesis, except that the
+        measurement model likelihood is evaluated in a single call for all particles
+        of hypotheses sharing a measurement model. This requires that the measurement
+        model :meth:`~.Model.logpdf` evaluates each state vector independently, which
+        is the case for Gaussian models.
+
+        Parameters
+        ----------
+        hypotheses : sequence of :class:`~.Hypothesis`
+            Hypotheses with predicted state and associated detection used for
+            updating.
+
+        Returns
+        -------
+        : list of :class:`~.ParticleState`
+            The state posteriors, in the same order as :obj:`hypotheses`
+        """
+        hypotheses_by_model = defaultdict(list)
+        for index, hypothesis in enumerate(hypotheses):
+            if hypothesis.measurement.measurement_model is None:
+                measurement_model = self.measurement_model
+            else:
+                measurement_model = hypothesis.measurement.measurement_model
+            hypotheses_by_model[measurement_model].append(index)
+
+        log_likelihoods = [None] * len(hypotheses)
+        for measurement_model, indices in hypotheses_by_model.items():
+            # Pair every particle with its hypothesis' measurement
+            num_particles = [len(hypotheses[index].prediction) for index in indices]
+            measurement_vectors = StateVectors(np.hstack([
+                np.tile(hypotheses[index].measurement.state_vector, num)
+                for index, num in zip(indices, num_particles)]))
+            particle_vectors = StateVectors(np.hstack([
+                hypotheses[index].prediction.state_vector for index in indices]))
+
+            log_likelihood = np.atleast_1d(measurement_model.logpdf(
+                State(measurement_vectors), State(particle_vectors), **kwargs))
+            for index, hypothesis_log_likelihood in zip(
+                    indices, np.split(log_likelihood, np.cumsum(num_particles)[:-1])):
+                log_likelihoods[index] = hypothesis_log_likelihood
+
+        return [self._update_weights(hypothesis, log_likelihood)
+                for hypothesis, log_likelihood in zip(hypotheses, log_likelihoods)]
+
+    def _update_weights(self, hypothesis, log_likelihood):
+        predicted_state = copy.copy(hypothesis.prediction)
+
+        new_weight = predicted_state.log_weight + log_likelihood
 
         # Normalise the weights
-        new_weight -= logsumexp(new_weight)
+        if normalise_log_weights is not None:
+            normalise_log_weights(new_weight)
+        else:
+            new_weight -= logsumexp(new_weight)
 
         predicted_state.weight = Probability.from_log_ufunc(new_weight)
 
@@ -71,7 +134,9 @@ class ParticleUpdater(Updater):
             particle_list=None
             )
 
-    @lru_cache()
+    # Cached as hypothesisers request the same prediction for each detection, but kept
+    # small to limit the number of (potentially large) particle states held in memory
+    @lru_cache(maxsize=8)
     def predict_measurement(self, state_prediction, measurement_model=None,
                             **kwargs):
 
@@ -119,36 +184,67 @@ class GromovFlowParticleUpdater(Updater):
 
         P = hypothesis.prediction.covar
         R = measurement_model.covar()
-        inv_R = inv(R)
-
-        # Start by making our own copy of the particle before we move them...
-        particles = [copy.copy(particle) for particle in hypothesis.prediction.particles]
+        R_cho = cho_factor(R)
+
+        def linearisation(H):
+            H_T = np.swapaxes(H, -1, -2)
+            P_H_T = P @ H_T
+            H_P = H @ P
+            # Solve R^-1 H for all particles' matrices at once, by stacking their columns
+            H_columns = np.moveaxis(H, -2, 0)
+            R_inv_H = np.moveaxis(
+                cho_solve(R_cho, H_columns.reshape(len(R), -1)).reshape(H_columns.shape),
+                0, -2)
+            return H, P_H_T, H_P, H @ P_H_T, np.swapaxes(R_inv_H, -1, -2)
+
+        try:
+            H = measurement_model.matrix()
+        except AttributeError:
+            linear_terms = None
+        else:
+            # Independent of particles and lambda, so only computed once
+            linear_terms = linearisation(H)
 
         def function(state, lambda_):
-            try:
-                H = measurement_model.matrix()
-            except AttributeError:
-                H = measurement_model.jacobian(state)
+            if linear_terms is not None:
+                H, P_H_T, H_P, H_P_H_T, H_T_R_inv = linear_terms
+            else:
+                # Linearise about each particle, giving shape (N, M, D)
+                H, P_H_T, H_P, H_P_H_T, H_T_R_inv = linearisation(np.array(
+                    [measurement_model.jacobian(State(state_vector))
+                     for state_vector in state.state_vector]))
 
             # Eq. (12) Ref [1]
-            a = P - lambda_*P@H.T@inv(R + lambda_*H@P@H.T)@H@P
-            b = a @ H.T @ inv_R
+            a = P - lambda_*P_H_T@np.linalg.solve(R + lambda_*H_P_H_T, H_P)
+            b = a @ H_T_R_inv
 
-            measurement_particle_state_vector = measurement_model.function(state, **kwargs)
-            f = -b @ (measurement_particle_state_vector - hypothesis.measurement.state_vector)
+            measurement_particle_state_vectors = measurement_model.function(state, **kwargs)
+            innovations = np.asfarray(
+                measurement_particle_state_vectors - hypothesis.measurement.state_vector)
+            if b.ndim == 3:
+                f = -np.einsum('nij,jn->in', b, innovations)
+            else:
+                f = -b @ innovations
 
             Q = b @ H @ a
-            B = cholesky_eps((Q+Q.T)/2)
+            Q = (Q + np.swapaxes(Q, -1, -2))/2
+            try:
+                B = np.swapaxes(np.linalg.cholesky(Q), -1, -2)
+            except np.linalg.LinAlgError:
+                # Q is typically only positive semi-definite
+                B = cholesky_eps(Q)
 
             return f, B
 
-        for particle in particles:
-            particle.state_vector = sde_euler_maruyama_integration(function, time_steps, particle)
+        # All particles are moved simultaneously
+        state_vector = sde_euler_maruyama_integration(
+            function, time_steps, hypothesis.prediction)
 
         return ParticleStateUpdate(
-            None,
+            state_vector,
             hypothesis,
-            particle_list=particles,
+            weight=hypothesis.prediction.weight,
+            parent=hypothesis.prediction.parent,
             timestamp=hypothesis.measurement.timestamp)
 
     predict_measurement = ParticleUpdater.predict_measurement
@@ -6,13 +6,16 @@ import numpy as np
 import pytest
 
 from ...models.measurement.linear import LinearGaussian
+from ...models.measurement.nonlinear import CartesianToBearingRange
 from ...resampler.particle import SystematicResampler
 from ...types.array import StateVectors
 from ...types.detection import Detection
 from ...types.hypothesis import SingleHypothesis
+from ...types.numeric import Probability
 from ...types.particle import Particle
 from ...types.prediction import (
     ParticleStatePrediction, ParticleMeasurementPrediction)
+from ...types.state import State
 from ...updater.particle import (
     ParticleUpdater, GromovFlowParticleUpdater,
     GromovFlowKalmanParticleUpdater)
@@ -69,3 +72,90 @@ def test_particle(updater):
     assert updated_state.hypothesis.prediction == prediction
     assert updated_state.hypothesis.measurement == measurement
     assert np.allclose(updated_state.mean, StateVectors([[20.0], [20.0]]), rtol=2e-2)
+
+
+def test_gromov_flow_nonlinear():
+    measurement_model = CartesianToBearingRange(
+        ndim_state=2, mapping=[0, 1], noise_covar=np.diag([0.0001, 0.04]))
+    timestamp = datetime.datetime.now()
+    particles = [Particle([[x], [y]], 1 / 9) for x in (10, 20, 30) for y in (10, 20, 30)]
+    prediction = ParticleStatePrediction(None, particle_list=particles, timestamp=timestamp)
+    measurement = Detection(
+        measurement_model.function(State([[20.], [20.]])), timestamp=timestamp,
+        measurement_model=measurement_model)
+
+    updated_state = GromovFlowParticleUpdater(measurement_model).update(
+        SingleHypothesis(prediction, measurement))
+
+    assert updated_state.timestamp == timestamp
+    assert updated_state.hypothesis.prediction == prediction
+    assert len(updated_state) == len(prediction)
+    assert np.all(updated_state.weight == prediction.weight)
+    assert np.allclose(updated_state.mean, StateVectors([[20.0], [20.0]]), rtol=5e-2)
+
+
+def test_gromov_flow_nonlinear_many_particles():
+    measurement_model = CartesianToBearingRange(
+        ndim_state=4, mapping=[0, 2], noise_covar=np.diag([0.0001, 0.04]))
+    timestamp = datetime.datetime.now()
+    num_particles = 500
+    state_vector = StateVectors(np.random.multivariate_normal(
+        [20., 1., 20., -1.], np.diag([9., 0.1, 9., 0.1]), num_particles).T)
+    prediction = ParticleStatePrediction(
+        state_vector, weight=np.full(num_particles, Probability(1/num_particles)),
+        timestamp=timestamp)
+    measurement = Detection(
+        measurement_model.function(State([[20.], [1.], [20.], [-1.]])), timestamp=timestamp,
+        measurement_model=measurement_model)
+
+    updated_state = GromovFlowParticleUpdater(measurement_model).update(
+        SingleHypothesis(prediction, measurement))
+
+    assert updated_state.state_vector.shape == (4, num_particles)
+    assert np.all(np.isfinite(updated_state.state_vector))
+    assert np.allclose(updated_state.mean[[0, 2]], [[20.], [20.]], rtol=5e-2)
+
+
+def test_particle_update_many():
+    linear_model = LinearGaussian(ndim_state=2, mapping=[0], noise_covar=np.array([[0.04]]))
+    nonlinear_model = CartesianToBearingRange(
+        ndim_state=2, mapping=[0, 1], noise_covar=np.diag([0.01, 0.5]))
+    updater = ParticleUpdater(linear_model)
+    timestamp = datetime.datetime.now()
+
+    hypotheses = []
+    for num_particles, measurement_model, measurement_vector in (
+            (9, None, [[20.]]),
+            (5, nonlinear_model, [[np.pi/4], [28.]]),
+            (9, linear_model, [[15.]]),
+            (1, nonlinear_model, [[-np.pi/4], [10.]])):
+        state_vector = StateVectors(np.random.uniform(5, 30, (2, num_particles)))
+        prediction = ParticleStatePrediction(
+            state_vector, weight=np.full(num_particles, Probability(1/num_particles)),
+            timestamp=timestamp)
+        measurement = Detection(
+            measurement_vector, timestamp=timestamp, measurement_model=measurement_model)
+        hypotheses.append(SingleHypothesis(prediction, measurement))
+
+    updated_states = updater.update_many(hypotheses)
+
+    assert len(updated_states) == len(hypotheses)
+    for hypothesis, updated_state in zip(hypotheses, updated_states):
+        expected_state = updater.update(hypothesis)
+        assert updated_state.hypothesis is hypothesis
+        assert updated_state.timestamp == timestamp
+        assert np.array_equal(updated_state.state_vector, expected_state.state_vector)
+        assert np.allclose(updated_state.log_weight, expected_state.log_weight)
+
+
+def test_normalise_log_weights():
+    pytest.importorskip('numba')
+    from scipy.special import logsumexp
+    from ...updater._particle_numba import normalise_log_weights
+
+    log_weights = np.log(np.random.uniform(0, 1, 1000))
+    log_weights[:10] = -np.inf  # Zero weight particles
+    expected = log_weights - logsumexp(log_weights)
+
+    normalise_log_weights(log_weights)
+    assert np.allclose(log_weights, expected)